@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+大文本显示性能测试 - 测量 LargeTextEdit 加载超大文本时界面线程的最长阻塞时间
+
+用法:
+    python bench_text_view.py [大小MB]
+
+默认使用 offscreen 平台，无需显示器。每个场景输出:
+    setText   - setText() 本身返回所用时间
+    最长阻塞  - 单次事件循环处理的最长时间，即界面最长卡顿
+    总耗时    - 全部内容载入完成所用时间
+    最长段落  - 文档中最长段落的字符数，决定单个段落的布局和绘制开销
+"""
+
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QEventLoop
+
+from text_view import LargeTextEdit
+
+
+def longest_block(edit):
+    """返回文档中最长段落的字符数"""
+    longest = 0
+    block = edit.document().begin()
+    while block.isValid():
+        longest = max(longest, block.length() - 1)
+        block = block.next()
+    return longest
+
+
+def run_set_text(app, name, text):
+    """测量一次 setText 的加载过程"""
+    edit = LargeTextEdit()
+    edit.resize(600, 400)
+    edit.show()
+    app.processEvents()
+
+    start = time.perf_counter()
+    edit.setText(text)
+    set_text_time = time.perf_counter() - start
+
+    max_slice = set_text_time
+    while edit.is_loading():
+        slice_start = time.perf_counter()
+        app.processEvents(QEventLoop.AllEvents)
+        max_slice = max(max_slice, time.perf_counter() - slice_start)
+    total = time.perf_counter() - start
+
+    assert edit.toPlainText() == text, "toPlainText() 与原文不一致"
+    report(name, set_text_time, max_slice, total, longest_block(edit))
+
+
+def run_append(app, name, pieces):
+    """测量逐段追加（流式输出）的过程"""
+    edit = LargeTextEdit()
+    edit.setReadOnly(True)
+    edit.resize(600, 400)
+    edit.show()
+    app.processEvents()
+
+    start = time.perf_counter()
+    max_slice = 0
+    for piece in pieces:
+        slice_start = time.perf_counter()
+        edit.appendText(piece)
+        app.processEvents(QEventLoop.AllEvents)
+        max_slice = max(max_slice, time.perf_counter() - slice_start)
+    total = time.perf_counter() - start
+
+    assert edit.toPlainText() == "".join(pieces), "toPlainText() 与原文不一致"
+    report(name, 0.0, max_slice, total, longest_block(edit))
+
+
+def report(name, set_text_time, max_slice, total, longest):
+    print(f"{name:<24} setText {set_text_time * 1000:8.1f}ms  最长阻塞 {max_slice * 1000:8.1f}ms  "
+          f"总耗时 {total:6.2f}s  最长段落 {longest}")
+
+
+def main():
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 8
+    size = int(size_mb * 1024 * 1024)
+    app = QApplication(sys.argv)
+
+    line = "The quick brown fox jumps over the lazy dog. 敏捷的棕色狐狸跳过了懒狗。\n"
+    run_set_text(app, f"多行文本 {size_mb:g}MB", line * (size // len(line)))
+    run_set_text(app, f"单行文本 {size_mb:g}MB", '{"data":"' + "x" * size + '"}')
+    run_append(app, "流式追加 2MB 单行", ["y" * 1024] * 2048)
+
+
+if __name__ == "__main__":
+    main()
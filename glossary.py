@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+术语表模块 - 使用 Aho-Corasick 自动机在文本中匹配术语
+"""
+
+import os
+import json
+import threading
+from collections import deque
+from typing import Dict, Optional, List, Tuple, Union
+
+
+class GlossaryError(Exception):
+    """术语表文件无法读取或格式错误"""
+
+
+def _fold_case(text: str) -> str:
+    """逐字符转小写，保持长度不变以便按位置判断词边界"""
+    folded = []
+    for ch in text:
+        lower = ch.lower()
+        folded.append(lower if len(lower) == 1 else ch)
+    return "".join(folded)
+
+
+def _is_word_char(ch: str) -> bool:
+    """ASCII字母数字视为单词字符，中日韩等文字不做词边界限制"""
+    return ch.isascii() and (ch.isalnum() or ch == "_")
+
+
+class Glossary:
+    """术语表
+
+    术语表为 {原文术语: 译文} 的映射，译文可以是字符串（所有目标语言通用），
+    也可以是 {目标语言: 译文} 的字典。
+    """
+
+    def __init__(self, terms: Dict[str, Union[str, Dict[str, str]]], ignore_case: bool = True):
+        """初始化并编译术语表
+
+        参数:
+            terms (dict): 原文术语 -> 译文
+            ignore_case (bool): 匹配时是否忽略大小写
+        """
+        self.ignore_case = ignore_case
+        self.terms = [term for term in terms if term]
+        self._translations = {term: terms[term] for term in self.terms}
+        self._build()
+
+    def _build(self):
+        """构建 Aho-Corasick 自动机"""
+        # 状态转移、失败指针、每个状态匹配到的术语下标
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+
+        for index, term in enumerate(self.terms):
+            key = _fold_case(term) if self.ignore_case else term
+            state = 0
+            for ch in key:
+                next_state = self._goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                    self._goto[state][ch] = next_state
+                state = next_state
+            self._output[state].append(index)
+
+        # 按层次遍历计算失败指针，并合并失败链上的输出
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(ch, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find_terms(self, text: str) -> List[str]:
+        """在文本中查找出现的术语，按首次出现顺序返回，线性时间扫描"""
+        haystack = _fold_case(text) if self.ignore_case else text
+        found = {}
+        state = 0
+        for pos, ch in enumerate(haystack):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for index in self._output[state]:
+                if index in found:
+                    continue
+                term = self.terms[index]
+                start = pos - len(term) + 1
+                # 英文等术语需要完整单词匹配，避免 "cat" 命中 "concatenate"
+                if _is_word_char(term[0]) and start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if _is_word_char(term[-1]) and pos + 1 < len(text) and _is_word_char(text[pos + 1]):
+                    continue
+                found[index] = start
+        return [self.terms[index] for index in sorted(found, key=found.get)]
+
+    def lookup(self, text: str, target_lang: str) -> List[Tuple[str, str]]:
+        """返回文本中出现的术语及其在目标语言下的译文"""
+        return self.translate_terms(self.find_terms(text), target_lang)
+
+    def translate_terms(self, terms: List[str], target_lang: str) -> List[Tuple[str, str]]:
+        """返回已匹配术语在目标语言下的译文，多种目标语言可共用一次 find_terms 的结果"""
+        pairs = []
+        for term in terms:
+            translation = self._translation(term, target_lang)
+            if translation:
+                pairs.append((term, translation))
+        return pairs
+
+    def _translation(self, term: str, target_lang: str) -> Optional[str]:
+        """获取术语在目标语言下的译文"""
+        translation = self._translations[term]
+        if isinstance(translation, dict):
+            return translation.get(target_lang)
+        return translation
+
+
+# 已加载的术语表缓存: 路径 -> (修改时间, 忽略大小写, 术语表或加载错误)
+_GLOSSARY_CACHE: Dict[str, Tuple[float, bool, Union[Glossary, GlossaryError]]] = {}
+_GLOSSARY_CACHE_LOCK = threading.Lock()
+
+
+def load_glossary(path: str, ignore_case: bool = True) -> Optional[Glossary]:
+    """加载术语表文件，文件未修改时复用已编译的自动机
+
+    参数:
+        path (str): JSON术语表路径
+        ignore_case (bool): 匹配时是否忽略大小写
+
+    返回:
+        Glossary: 术语表，文件不存在时返回 None
+
+    异常:
+        GlossaryError: 文件无法读取、不是合法JSON或顶层不是对象
+    """
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+
+    with _GLOSSARY_CACHE_LOCK:
+        cached = _GLOSSARY_CACHE.get(path)
+        if not (cached and cached[0] == mtime and cached[1] == ignore_case):
+            # 加载错误同样按修改时间缓存，文件修正前不会反复解析
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    terms = json.load(f)
+                if not isinstance(terms, dict):
+                    raise GlossaryError(f"术语表 {path} 格式错误: 顶层必须是对象")
+                result = Glossary(terms, ignore_case=ignore_case)
+            except GlossaryError as e:
+                result = e
+            except (OSError, UnicodeDecodeError) as e:
+                result = GlossaryError(f"无法读取术语表 {path}: {str(e)}")
+            except json.JSONDecodeError as e:
+                result = GlossaryError(f"术语表 {path} 不是合法的JSON: {str(e)}")
+            cached = (mtime, ignore_case, result)
+            _GLOSSARY_CACHE[path] = cached
+
+    if isinstance(cached[2], GlossaryError):
+        raise cached[2]
+    return cached[2]
@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+翻译历史模块 - 基于 SQLite 全文索引的历史记录存储
+"""
+
+import time
+import hashlib
+import sqlite3
+import threading
+from typing import Dict, Any, Optional, List
+
+# 全文检索使用 trigram 分词，支持中日韩文本的子串搜索，但每个关键词至少需要3个字符
+_MIN_FTS_QUERY_LEN = 3
+# 两个字符的关键词（如常见的中文词）由单独的二元组索引检索
+_BIGRAM_LEN = 2
+
+
+def _source_hash(text: str) -> str:
+    """计算原文摘要，用于快速查找相同原文的历史译文"""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _is_bigram(keyword: str) -> bool:
+    """关键词能否用二元组索引检索，只索引由字母和数字组成的二元组"""
+    return len(keyword) == _BIGRAM_LEN and keyword.isalnum()
+
+
+def _bigrams(*texts: str) -> str:
+    """提取文本中所有不重复的二元组，以空格分隔，作为二元组索引的内容"""
+    grams = set()
+    for text in texts:
+        text = text.lower()
+        grams.update(text[i:i + _BIGRAM_LEN] for i in range(len(text) - 1))
+    return " ".join(gram for gram in grams if _is_bigram(gram))
+
+
+def _quote(keyword: str) -> str:
+    """将关键词转为全文检索的短语"""
+    return '"' + keyword.replace('"', '""') + '"'
+
+
+class TranslationHistory:
+    """翻译历史记录"""
+
+    def __init__(self, path: str = "history.db"):
+        """打开（必要时创建）历史数据库
+
+        参数:
+            path (str): SQLite数据库文件路径
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._init_schema()
+
+    def _init_schema(self):
+        """创建数据表、索引和全文索引"""
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    created_at REAL NOT NULL,
+                    source TEXT NOT NULL,
+                    target TEXT NOT NULL,
+                    target_lang TEXT NOT NULL,
+                    backend TEXT NOT NULL,
+                    latency REAL NOT NULL,
+                    source_hash TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL
+                )
+            """)
+            self._conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_history_reuse
+                ON history (source_hash, fingerprint)
+            """)
+
+            # 旧版SQLite不支持 trigram 分词时退化为 LIKE 查询
+            try:
+                self._conn.execute("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5(
+                        source, target, content='history', content_rowid='id', tokenize='trigram'
+                    )
+                """)
+                self._conn.execute("""
+                    CREATE TRIGGER IF NOT EXISTS history_fts_insert AFTER INSERT ON history BEGIN
+                        INSERT INTO history_fts (rowid, source, target) VALUES (new.id, new.source, new.target);
+                    END
+                """)
+                self._conn.execute("""
+                    CREATE TRIGGER IF NOT EXISTS history_fts_delete AFTER DELETE ON history BEGIN
+                        INSERT INTO history_fts (history_fts, rowid, source, target)
+                        VALUES ('delete', old.id, old.source, old.target);
+                    END
+                """)
+                # 二元组索引只存记录ID，不存内容和位置，由 record() 写入
+                self._conn.execute("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS history_bigram USING fts5(
+                        grams, content='', detail=none, tokenize='unicode61 remove_diacritics 0'
+                    )
+                """)
+                self.has_fts = True
+            except sqlite3.OperationalError:
+                self.has_fts = False
+
+    def record(self, source: str, target: str, target_lang: str, backend: str, latency: float,
+               fingerprint: str = "") -> int:
+        """记录一次翻译
+
+        参数:
+            source (str): 原文
+            target (str): 译文
+            target_lang (str): 目标语言
+            backend (str): 使用的翻译服务
+            latency (float): 翻译耗时（秒）
+            fingerprint (str): 翻译请求指纹（模型配置和提示词的摘要），复用译文时据此匹配
+
+        返回:
+            int: 新记录的ID
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO history (created_at, source, target, target_lang, backend, latency, source_hash, fingerprint) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (time.time(), source, target, target_lang, backend, latency, _source_hash(source), fingerprint)
+            )
+            if self.has_fts:
+                self._conn.execute(
+                    "INSERT INTO history_bigram (rowid, grams) VALUES (?, ?)",
+                    (cursor.lastrowid, _bigrams(source, target))
+                )
+            return cursor.lastrowid
+
+    def find(self, source: str, fingerprint: str) -> Optional[str]:
+        """查找相同原文、相同请求指纹的最近一次译文
+
+        参数:
+            source (str): 原文
+            fingerprint (str): 翻译请求指纹，模型、参数、目标语言或术语改变时随之改变
+        """
+        if not fingerprint:
+            return None
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT source, target FROM history "
+                "WHERE source_hash = ? AND fingerprint = ? "
+                "ORDER BY id DESC LIMIT 5",
+                (_source_hash(source), fingerprint)
+            ).fetchall()
+        for row in rows:
+            if row["source"] == source:
+                return row["target"]
+        return None
+
+    def search(self, query: str = "", before_id: Optional[int] = None, limit: int = 200) -> List[Dict[str, Any]]:
+        """按时间倒序分页查询历史记录
+
+        使用ID作为游标分页，翻页开销与已浏览的页数无关。3个字符及以上的关键词
+        走 trigram 全文索引，由字母或数字组成的两字符关键词走二元组索引，其余
+        短关键词只在索引命中的记录中用 LIKE 过滤。只有单个字符的关键词时退化
+        为 LIKE 全表查询。
+
+        参数:
+            query (str): 搜索关键词，为空时返回全部记录，多个关键词以空格分隔
+            before_id (int): 只返回ID小于该值的记录，传入上一页最后一条的ID即可翻到下一页
+            limit (int): 每页记录数
+
+        返回:
+            list: 历史记录字典列表
+        """
+        if before_id is None:
+            before_id = 2 ** 63 - 1
+        keywords = query.split()
+
+        long_keywords = [keyword for keyword in keywords if len(keyword) >= _MIN_FTS_QUERY_LEN]
+        short_keywords = [keyword for keyword in keywords if len(keyword) < _MIN_FTS_QUERY_LEN]
+        bigram_keywords = [keyword for keyword in short_keywords if _is_bigram(keyword)]
+
+        # 可走索引的关键词交给对应的全文索引，其余短关键词在命中的记录中用 LIKE 过滤
+        matches = []
+        like_keywords = keywords
+        if self.has_fts:
+            if long_keywords:
+                matches.append(("history_fts", long_keywords))
+            if bigram_keywords:
+                matches.append(("history_bigram", bigram_keywords))
+            like_keywords = [keyword for keyword in short_keywords if keyword not in bigram_keywords]
+
+        if len(matches) == 1:
+            # 按索引倒序扫描命中的记录，凑满一页即停止
+            index, indexed = matches[0]
+            sql = (
+                f"SELECT h.* FROM {index} f JOIN history h ON h.id = f.rowid "
+                f"WHERE {index} MATCH ? AND f.rowid < ?"
+            )
+            params = [" ".join(_quote(keyword) for keyword in indexed), before_id]
+            order = "f.rowid"
+        else:
+            sql = "SELECT * FROM history h WHERE h.id < ?"
+            params = [before_id]
+            order = "h.id"
+            if matches:
+                # 两个索引各自的命中结果取交集，开销只与索引大小有关，与关键词是否常见无关
+                sql += " AND h.id IN (" + " INTERSECT ".join(
+                    f"SELECT rowid FROM {index} WHERE {index} MATCH ? AND rowid < ?" for index, _ in matches
+                ) + ")"
+                for _, indexed in matches:
+                    params += [" ".join(_quote(keyword) for keyword in indexed), before_id]
+
+        for keyword in like_keywords:
+            sql += " AND (h.source LIKE ? ESCAPE '\\' OR h.target LIKE ? ESCAPE '\\')"
+            pattern = "%" + keyword.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            params += [pattern, pattern]
+        sql += f" ORDER BY {order} DESC LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params).fetchall()]
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+
+# 已打开的历史数据库: 路径 -> 历史记录实例
+_HISTORIES: Dict[str, TranslationHistory] = {}
+_HISTORIES_LOCK = threading.Lock()
+
+
+def get_history(path: str = "history.db") -> TranslationHistory:
+    """获取共享的历史记录实例，同一路径只打开一次数据库"""
+    with _HISTORIES_LOCK:
+        if path not in _HISTORIES:
+            _HISTORIES[path] = TranslationHistory(path)
+        return _HISTORIES[path]
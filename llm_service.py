@@ -7,8 +7,98 @@
 
 import os
 import json
+import time
+import hashlib
+import sqlite3
+import threading
 import requests
-from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, Optional, List, Callable, Tuple
+
+from glossary import load_glossary, GlossaryError
+from history import get_history
+
+
+class TranslationError(str):
+    """翻译失败时返回的错误信息，可当作普通字符串使用，但不会写入历史记录"""
+
+
+# 已注册的翻译后端: 服务名 -> 翻译函数 backend(service, text, target_lang) -> str
+_BACKENDS: Dict[str, Callable[..., str]] = {}
+
+
+def register_backend(name: str):
+    """注册翻译后端的装饰器
+    
+    参数:
+        name (str): 服务名，对应配置中的 translation_service 和 services 下的键
+    """
+    def decorator(func):
+        _BACKENDS[name] = func
+        return func
+    return decorator
+
+
+def available_backends() -> List[str]:
+    """返回所有已注册的翻译后端名称"""
+    return list(_BACKENDS)
+
+
+# 常驻内存的进程内模型，同一时间只保留一个: (加载参数, 模型, 推理锁)
+_LLAMA_MODEL: Optional[Tuple[Tuple, Any, threading.Lock]] = None
+_LLAMA_MODEL_LOCK = threading.Lock()
+
+
+def _get_llama_model(service_config: Dict[str, Any]) -> Tuple[Any, threading.Lock]:
+    """获取（必要时加载）常驻内存的 llama.cpp 模型
+    
+    模型路径或加载参数改变时先释放旧模型再加载新模型，避免多份模型同时占用内存。
+    """
+    global _LLAMA_MODEL
+    
+    model_path = service_config.get("model_path", "")
+    n_threads = int(service_config.get("n_threads") or 0) or os.cpu_count() or 1
+    n_batch = int(service_config.get("n_batch", 512))
+    n_ctx = int(service_config.get("n_ctx", 2048))
+    key = (model_path, n_threads, n_batch, n_ctx)
+    
+    with _LLAMA_MODEL_LOCK:
+        if _LLAMA_MODEL is not None and _LLAMA_MODEL[0] == key:
+            return _LLAMA_MODEL[1], _LLAMA_MODEL[2]
+        
+        if _LLAMA_MODEL is not None:
+            _, old_model, old_lock = _LLAMA_MODEL
+            _LLAMA_MODEL = None
+            # 等待旧模型上正在进行的推理结束后再释放
+            with old_lock:
+                close = getattr(old_model, "close", None)
+                if close is not None:
+                    close()
+            del old_model
+        
+        from llama_cpp import Llama
+        
+        model = Llama(
+            model_path=model_path,
+            n_ctx=n_ctx,
+            n_threads=n_threads,
+            n_batch=n_batch,
+            n_gpu_layers=0,
+            verbose=False,
+        )
+        _LLAMA_MODEL = (key, model, threading.Lock())
+        return model, _LLAMA_MODEL[2]
+
+
+def _is_current_llama_model(model: Any) -> bool:
+    """模型是否仍是当前常驻的模型
+    
+    需在持有该模型推理锁时调用：替换模型时会先将其移出常驻位置，再等待推理锁释放后才关闭，
+    因此持锁期间检查为真即可安全推理。
+    """
+    current = _LLAMA_MODEL
+    return current is not None and current[1] is model
+
 
 class TranslationService:
     """翻译服务基类"""
@@ -21,6 +111,38 @@ class TranslationService:
         """
         self.config = self.load_config(config_path)
         self.service_type = self.config.get("translation_service", "openai")
+        
+        glossary_config = self.config.get("glossary", {})
+        self.glossary = None
+        self.glossary_error = None
+        if glossary_config.get("enabled", True) and glossary_config.get("path"):
+            try:
+                self.glossary = load_glossary(glossary_config["path"], glossary_config.get("ignore_case", True))
+            except GlossaryError as e:
+                self.glossary_error = str(e)
+        # 最近一次匹配的原文及其中出现的术语，多语言翻译时各目标语言共用
+        self._glossary_match: Optional[Tuple[str, List[str]]] = None
+        self._glossary_match_lock = threading.Lock()
+        
+        history_config = self.config.get("history", {})
+        self.history = None
+        self.history_error = None
+        self.reuse_history = history_config.get("reuse", True)
+        if history_config.get("enabled", True):
+            history_path = history_config.get("path", "history.db")
+            try:
+                self.history = get_history(history_path)
+            except sqlite3.Error as e:
+                self.history_error = f"无法打开数据库 {history_path}: {str(e)}"
+    
+    def warnings(self) -> List[str]:
+        """返回导致部分功能未生效的问题，供界面提示用户"""
+        warnings = []
+        if self.glossary_error:
+            warnings.append(f"术语表未生效: {self.glossary_error}")
+        if self.history_error:
+            warnings.append(f"翻译历史未生效: {self.history_error}")
+        return warnings
     
     def load_config(self, config_path: str) -> Dict[str, Any]:
 
@@ -40,15 +162,120 @@ class TranslationService:
                 }
             }
     
-    def translate(self, text: str, target_lang: str = "中文") -> str:
+    def translate(self, text: str, target_lang: str = "中文", reuse: Optional[bool] = None) -> str:
 
-        if self.service_type == "openai":
-            return self.translate_with_openai(text, target_lang)
-        elif self.service_type == "local_llm":
-            return self.translate_with_local_llm(text, target_lang)
-        else:
-            return f"不支持的翻译服务: {self.service_type}"
+        backend = _BACKENDS.get(self.service_type)
+        if backend is None:
+            return TranslationError(f"不支持的翻译服务: {self.service_type}")
+        
+        if reuse is None:
+            reuse = self.reuse_history
+        fingerprint = self.request_fingerprint(text, target_lang) if self.history is not None else ""
+        
+        # 相同原文以相同模型配置和提示词翻译过时直接复用历史译文
+        if self.history is not None and reuse:
+            cached = self.history.find(text, fingerprint)
+            if cached is not None:
+                return cached
+        
+        start = time.perf_counter()
+        translated = backend(self, text, target_lang)
+        latency = time.perf_counter() - start
+        
+        if self.history is not None and not isinstance(translated, TranslationError):
+            try:
+                self.history.record(text, translated, target_lang, self.service_type, latency, fingerprint)
+            except sqlite3.Error as e:
+                # 记录失败不影响本次译文，但需让界面提示用户
+                self.history_error = f"保存记录失败: {str(e)}"
+        
+        return translated
+    
+    def build_messages(self, text: str, target_lang: str) -> List[Dict[str, str]]:
+        """构造翻译请求的对话消息，只注入原文中实际出现的术语"""
+        system_prompt = f"你是一个翻译助手，请将以下文本翻译成{target_lang}，只输出翻译结果，不要加任何解释。"
+        
+        if self.glossary is not None:
+            max_terms = self.config.get("glossary", {}).get("max_terms", 100)
+            term_pairs = self.glossary.translate_terms(self.match_glossary(text), target_lang)[:max_terms]
+            if term_pairs:
+                term_lines = "\n".join(f"{source} -> {target}" for source, target in term_pairs)
+                system_prompt += f"\n请严格按照以下术语表翻译对应术语：\n{term_lines}"
+        
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": text}
+        ]
+    
+    def request_fingerprint(self, text: str, target_lang: str) -> str:
+        """计算翻译请求指纹
+        
+        由翻译服务、该服务的全部配置（模型、端点、温度等）和实际发送的系统提示词
+        （含目标语言和匹配到的术语）得出，任一项改变都不会复用旧译文。
+        """
+        request = {
+            "backend": self.service_type,
+            "config": self.config.get("services", {}).get(self.service_type, {}),
+            "system": self.build_messages(text, target_lang)[0]["content"],
+        }
+        payload = json.dumps(request, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+    
+    def match_glossary(self, text: str) -> List[str]:
+        """查找原文中出现的术语，同一原文只扫描一次"""
+        if self.glossary is None:
+            return []
+        with self._glossary_match_lock:
+            if self._glossary_match is not None and self._glossary_match[0] == text:
+                return self._glossary_match[1]
+        terms = self.glossary.find_terms(text)
+        with self._glossary_match_lock:
+            self._glossary_match = (text, terms)
+        return terms
+    
+    def translate_multi(self, text: str, target_langs: List[str],
+                        on_result: Optional[Callable[[str, str], None]] = None,
+                        max_workers: Optional[int] = None,
+                        reuse: Optional[bool] = None) -> Dict[str, str]:
+        """将同一段文本并发翻译成多种目标语言
+        
+        参数:
+            text (str): 原文
+            target_langs (list): 目标语言列表，重复项只翻译一次
+            on_result (callable): 每完成一种语言即回调 on_result(target_lang, translated_text)
+            max_workers (int): 最大并发数，默认取配置中的 fanout.max_workers
+            reuse (bool): 是否复用历史译文，默认取配置中的 history.reuse，传 False 强制重新翻译
+        
+        返回:
+            dict: 目标语言 -> 翻译结果，顺序与 target_langs 一致
+        """
+        langs = list(dict.fromkeys(target_langs))
+        if not langs:
+            return {}
+        
+        if max_workers is None:
+            max_workers = self.config.get("fanout", {}).get("max_workers", 5)
+        max_workers = max(1, min(int(max_workers), len(langs)))
+        
+        # 提交任务前先扫描一次术语，各目标语言共用匹配结果
+        self.match_glossary(text)
+        
+        results = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(self.translate, text, lang, reuse): lang for lang in langs}
+            for future in as_completed(futures):
+                lang = futures[future]
+                try:
+                    translated = future.result()
+                except Exception as e:
+                    translated = TranslationError(f"翻译错误: {str(e)}\n原文: {text}")
+                results[lang] = translated
+                if on_result is not None:
+                    on_result(lang, translated)
+        
+        return {lang: results[lang] for lang in langs}
     
+    @register_backend("openai")
     def translate_with_openai(self, text: str, target_lang: str) -> str:
 
         try:
@@ -56,7 +283,7 @@ class TranslationService:
             
             api_key = os.getenv("OPENAI_API_KEY")
             if not api_key:
-                return f"错误: 未设置OpenAI API密钥。原文: {text}"
+                return TranslationError(f"错误: 未设置OpenAI API密钥。原文: {text}")
             
             openai.api_key = api_key
             
@@ -64,17 +291,15 @@ class TranslationService:
             
             response = openai.ChatCompletion.create(
                 model=service_config.get("model", "gpt-3.5-turbo"),
-                messages=[
-                    {"role": "system", "content": f"你是一个翻译助手，请将以下文本翻译成{target_lang}，只输出翻译结果，不要加任何解释。"},
-                    {"role": "user", "content": text}
-                ],
+                messages=self.build_messages(text, target_lang),
                 temperature=service_config.get("temperature", 0.3),
             )
             
             return response.choices[0].message.content.strip()
         except Exception as e:
-            return f"OpenAI翻译错误: {str(e)}\n原文: {text}"
+            return TranslationError(f"OpenAI翻译错误: {str(e)}\n原文: {text}")
     
+    @register_backend("local_llm")
     def translate_with_local_llm(self, text: str, target_lang: str) -> str:
 
         try:
@@ -92,10 +317,7 @@ class TranslationService:
             
             payload = {
                 "model": service_config.get("model", "model_name"),
-                "messages": [
-                    {"role": "system", "content": f"你是一个翻译助手，请将以下文本翻译成{target_lang}，只输出翻译结果，不要加任何解释。"},
-                    {"role": "user", "content": text}
-                ],
+                "messages": self.build_messages(text, target_lang),
                 "temperature": service_config.get("temperature", 0.3)
             }
             
@@ -109,13 +331,50 @@ class TranslationService:
                 result = response.json()
                 return result["choices"][0]["message"]["content"].strip()
             else:
-                return f"本地LLM API错误: HTTP {response.status_code}\n原文: {text}"
+                return TranslationError(f"本地LLM API错误: HTTP {response.status_code}\n原文: {text}")
         
         except Exception as e:
-            return f"本地LLM翻译错误: {str(e)}\n原文: {text}"
+            return TranslationError(f"本地LLM翻译错误: {str(e)}\n原文: {text}")
+    
+    @register_backend("llama_cpp")
+    def translate_with_llama_cpp(self, text: str, target_lang: str) -> str:
+        """使用进程内 llama.cpp 模型在CPU上翻译，无需HTTP服务"""
+        try:
+            service_config = self.config["services"]["llama_cpp"]
+            if not service_config.get("model_path"):
+                return TranslationError(f"错误: 未设置llama.cpp模型路径。原文: {text}")
+            
+            messages = self.build_messages(text, target_lang)
+            response = None
+            while response is None:
+                model, lock = _get_llama_model(service_config)
+                
+                # 同一模型实例不支持并发推理，多语言翻译时依次执行。
+                # 取得推理锁时模型可能已被其他线程替换并释放，此时重新获取
+                with lock:
+                    if not _is_current_llama_model(model):
+                        continue
+                    response = model.create_chat_completion(
+                        messages=messages,
+                        temperature=service_config.get("temperature", 0.3),
+                        max_tokens=service_config.get("max_tokens") or None,
+                    )
+            
+            return response["choices"][0]["message"]["content"].strip()
+        except Exception as e:
+            return TranslationError(f"llama.cpp翻译错误: {str(e)}\n原文: {text}")
+
+
+def translate_text(text: str, target_lang: str = "中文", config_path: str = "config.json",
+                   reuse: Optional[bool] = None) -> str:
+
+    service = TranslationService(config_path)
+    return service.translate(text, target_lang, reuse=reuse)
 
 
-def translate_text(text: str, target_lang: str = "中文", config_path: str = "config.json") -> str:
+def translate_text_multi(text: str, target_langs: List[str], config_path: str = "config.json",
+                         on_result: Optional[Callable[[str, str], None]] = None,
+                         reuse: Optional[bool] = None) -> Dict[str, str]:
 
     service = TranslationService(config_path)
-    return service.translate(text, target_lang)
+    return service.translate_multi(text, target_langs, on_result=on_result, reuse=reuse)
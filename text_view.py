@@ -0,0 +1,334 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+文本显示模块 - 超大原文和译文的分块加载与逐段对照显示
+"""
+
+from itertools import zip_longest
+
+from PyQt5.QtWidgets import QApplication, QPlainTextEdit, QTableView, QHeaderView, QAbstractItemView
+from PyQt5.QtCore import Qt, QTimer, QMimeData, QAbstractTableModel, QModelIndex
+from PyQt5.QtGui import QTextCursor, QKeySequence
+
+
+def break_long_lines(text, limit, first_column=0):
+    """在超过 limit 个字符的行中插入仅用于显示的换行
+
+    参数:
+        text (str): 原始文本
+        limit (int): 每个显示段落的最大字符数
+        first_column (int): 文本第一行之前已显示的字符数，用于续接追加的内容
+
+    返回:
+        tuple: (显示文本, 最后一行已显示的字符数)
+    """
+    pieces = []
+    column = first_column
+    for number, line in enumerate(text.split("\n")):
+        if number:
+            pieces.append("\n")
+            column = 0
+        pos = 0
+        while column + len(line) - pos > limit:
+            take = limit - column
+            pieces.append(line[pos:pos + take])
+            pieces.append("\n")
+            pos += take
+            column = 0
+        pieces.append(line[pos:])
+        column += len(line) - pos
+    return "".join(pieces), column
+
+
+class LargeTextEdit(QPlainTextEdit):
+    """适合超大文本的文本框
+
+    基于按段落布局、只绘制可见部分的 QPlainTextEdit。超大文本通过 QTextCursor
+    分块追加，每次事件循环只插入一块，界面不会因一次性设置全部文本而卡住。
+
+    Qt 每次插入都会重新布局整个段落，单行数MB的文本（如压缩过的JSON）会让分块
+    加载变成平方复杂度。因此分块加载的文本中超过 MAX_BLOCK_LENGTH 的行在显示时
+    会被折成多段，文本框进入只读的"仅查看"模式，toPlainText() 仍返回未改动的
+    原文。仅查看模式下按粘贴键替换全部内容，按删除键清空。不超过 DIRECT_LIMIT
+    且没有超过 DIRECT_LINE_LIMIT 的行的文本一次性设置，始终可以编辑。
+    """
+    # 不超过该长度的文本直接一次性设置
+    DIRECT_LIMIT = 256 * 1024
+    # 直接设置的文本中单行的最大字符数。Qt 布局单行的开销随行长平方增长，
+    # 16K 个字符约需数十毫秒，远长于正常段落
+    DIRECT_LINE_LIMIT = 16 * 1024
+    # 分块加载时每块的字符数
+    CHUNK_SIZE = 64 * 1024
+    # 单个显示段落的最大字符数，保证每个段落的布局和绘制开销有上限
+    MAX_BLOCK_LENGTH = 4096
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pending_text = ""
+        self._pending_pos = 0
+        # 仅查看模式下的完整原文，为 None 时文档内容即原文
+        self._full_text = None
+        # 文档最后一行已显示的字符数
+        self._tail_column = 0
+        # 分块加载或仅查看期间临时修改了只读和撤销设置，结束后恢复
+        self._overridden = False
+        self._was_read_only = False
+        self._was_undo_enabled = True
+        self._load_timer = QTimer(self)
+        self._load_timer.setInterval(0)
+        self._load_timer.timeout.connect(self._load_next_chunk)
+
+    def setText(self, text):
+        """替换全部文本，超大文本分块加载，其中的超长行折段显示"""
+        self._stop_loading()
+        self._full_text = None
+        self.setToolTip("")
+        if self._fits_direct(text):
+            self._restore_editing()
+            self.setPlainText(text)
+            return
+
+        # 加载期间暂停撤销记录并禁止编辑，避免用户修改与分块插入交错。
+        # 超长行在逐块插入时才折段，无需预先扫描全文
+        self._override_editing()
+        self.clear()
+        self._tail_column = 0
+        self._pending_text = text
+        self._pending_pos = 0
+        self._load_next_chunk()
+        if self._pending_text:
+            self._load_timer.start()
+
+    def appendText(self, text):
+        """在末尾追加文本，不重置已有内容，适合流式输出"""
+        if self._full_text is not None:
+            self._full_text += text
+        if self.is_loading():
+            self._pending_text += text
+            return
+
+        if self._full_text is None:
+            self._tail_column = self.document().lastBlock().length() - 1
+            if (self.document().characterCount() + len(text) <= self.DIRECT_LIMIT
+                    and self._fits_direct(text, self._tail_column)):
+                self._insert_display_text(text)
+                return
+        display, tail_column = break_long_lines(text, self.MAX_BLOCK_LENGTH, self._tail_column)
+        if len(display) != len(text) and self._full_text is None:
+            # 追加后不能再直接显示且出现超长行，重新分块加载以折段全部超长行
+            self.setText(super().toPlainText() + text)
+            return
+        self._insert_display_text(display)
+        self._tail_column = tail_column
+
+    def toPlainText(self):
+        """返回完整原文，包括分块加载尚未插入的部分和折段前的超长行"""
+        if self._full_text is not None:
+            return self._full_text
+        if self.is_loading():
+            return super().toPlainText() + self._pending_text[self._pending_pos:]
+        return super().toPlainText()
+
+    def is_loading(self):
+        """是否正在分块加载"""
+        return self._load_timer.isActive()
+
+    def is_view_only(self):
+        """是否因超长行处于仅查看模式"""
+        return self._full_text is not None
+
+    def keyPressEvent(self, event):
+        """仅查看模式下粘贴替换全部内容，删除键清空"""
+        if self._full_text is not None and not self._was_read_only and not self.is_loading():
+            if event.matches(QKeySequence.Paste):
+                self.setText(QApplication.clipboard().text())
+                return
+            if event.key() in (Qt.Key_Backspace, Qt.Key_Delete):
+                self.setText("")
+                return
+        super().keyPressEvent(event)
+
+    def insertFromMimeData(self, source):
+        """粘贴超大文本或超长行时走分块加载，而不是一次插入整段"""
+        text = source.text() if source.hasText() else ""
+        if not self._fits_direct(text):
+            cursor = self.textCursor()
+            current = self.toPlainText()
+            self.setText(current[:cursor.selectionStart()] + text + current[cursor.selectionEnd():])
+            return
+        super().insertFromMimeData(source)
+
+    def _fits_direct(self, text, first_column=0):
+        """文本能否直接设置，first_column 为文本第一行之前已有的字符数"""
+        if len(text) > self.DIRECT_LIMIT:
+            return False
+        lines = text.split("\n")
+        return max(first_column + len(lines[0]), max(map(len, lines))) <= self.DIRECT_LINE_LIMIT
+
+    def createMimeDataFromSelection(self):
+        """仅查看模式下复制或拖出的是原文，不含折段插入的换行"""
+        if self._full_text is None:
+            return super().createMimeDataFromSelection()
+        cursor = self.textCursor()
+        start = self._original_position(cursor.selectionStart())
+        end = self._original_position(cursor.selectionEnd())
+        mime = QMimeData()
+        mime.setText(self._full_text[start:end])
+        return mime
+
+    def _original_position(self, position):
+        """将仅查看模式下文档中的位置换算为原文中的位置
+
+        文档内容即 break_long_lines(原文)：原文每行按 MAX_BLOCK_LENGTH 个字符
+        一段折开，段与段之间各插入一个换行。
+        """
+        limit = self.MAX_BLOCK_LENGTH
+        original = 0
+        for line in self._full_text.split("\n"):
+            width = len(line) + max(0, len(line) - 1) // limit
+            if position <= width:
+                return original + position - position // (limit + 1)
+            position -= width + 1
+            original += len(line) + 1
+        return len(self._full_text)
+
+    def _enter_view_only(self, text):
+        """进入仅查看模式并记录完整原文"""
+        self._full_text = text
+        if not self._was_read_only:
+            self.setToolTip("文本含超长行，仅供查看：粘贴可替换全部内容，删除键清空")
+
+    def _insert_display_text(self, text):
+        """在文档末尾插入显示文本"""
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(text)
+
+    def _override_editing(self):
+        """暂停撤销记录并设为只读"""
+        if self._overridden:
+            return
+        self._was_read_only = self.isReadOnly()
+        self._was_undo_enabled = self.isUndoRedoEnabled()
+        self._overridden = True
+        self.setUndoRedoEnabled(False)
+        self.setReadOnly(True)
+
+    def _restore_editing(self):
+        """恢复原有的只读和撤销设置"""
+        if not self._overridden:
+            return
+        self._overridden = False
+        self.setReadOnly(self._was_read_only)
+        self.setUndoRedoEnabled(self._was_undo_enabled)
+
+    def _load_next_chunk(self):
+        """插入下一块文本，尽量在换行处切分，超长行折段显示"""
+        start = self._pending_pos
+        end = min(start + self.CHUNK_SIZE, len(self._pending_text))
+        if end < len(self._pending_text):
+            newline = self._pending_text.rfind("\n", start, end)
+            if newline > start:
+                end = newline + 1
+
+        chunk = self._pending_text[start:end]
+        display, self._tail_column = break_long_lines(chunk, self.MAX_BLOCK_LENGTH, self._tail_column)
+        if len(display) != len(chunk) and self._full_text is None:
+            # 待加载文本包含此前插入的全部内容，即完整原文
+            self._enter_view_only(self._pending_text)
+        self._insert_display_text(display)
+        self._pending_pos = end
+
+        if self._pending_pos >= len(self._pending_text):
+            self._stop_loading()
+
+    def _stop_loading(self):
+        """结束分块加载，不处于仅查看模式时恢复编辑状态"""
+        self._load_timer.stop()
+        self._pending_text = ""
+        self._pending_pos = 0
+        if self._full_text is None:
+            self._restore_editing()
+
+
+def split_segments(text):
+    """按行切分段落，忽略空行"""
+    return [line for line in text.splitlines() if line.strip()]
+
+
+class SegmentTableModel(QAbstractTableModel):
+    """原文与译文逐段对照的表格模型
+
+    按位置对齐：第 N 个非空行对第 N 个非空行。译文合并或拆分了段落时两侧
+    段落数不同，此后的行会错位，可由 is_aligned() 检查。
+    """
+    COLUMNS = ["原文", "译文"]
+    # 单元格最多显示的字符数，超出部分不参与绘制
+    PREVIEW_LENGTH = 1000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.segments = []
+        self.source_count = 0
+        self.target_count = 0
+
+    def set_texts(self, source, target):
+        """按段落对齐原文和译文"""
+        source_segments = split_segments(source)
+        target_segments = split_segments(target)
+        self.beginResetModel()
+        self.source_count = len(source_segments)
+        self.target_count = len(target_segments)
+        self.segments = list(zip_longest(source_segments, target_segments, fillvalue=""))
+        self.endResetModel()
+
+    def is_aligned(self):
+        """原文和译文的段落数是否相同"""
+        return self.source_count == self.target_count
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.segments)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.ToolTipRole):
+            return None
+        return self.segments[index.row()][index.column()][:self.PREVIEW_LENGTH]
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.COLUMNS[section]
+        return str(section + 1)
+
+
+class AlignedSegmentView(QTableView):
+    """原文与译文并排对照视图
+
+    原文和译文位于同一表格的两列，共用一个滚动条，滚动始终同步。
+    行高固定，只绘制可见行，段落数量再多绘制开销也不变。超出 ROW_LINES 行的
+    段落省略显示，悬停可查看更多内容。
+    """
+    ROW_LINES = 3
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.segment_model = SegmentTableModel(self)
+        self.setModel(self.segment_model)
+        self.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setWordWrap(True)
+        self.setTextElideMode(Qt.ElideRight)
+        self.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.verticalHeader().setDefaultSectionSize(self.fontMetrics().lineSpacing() * self.ROW_LINES + 6)
+        self.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+
+    def set_texts(self, source, target):
+        """显示新的原文和译文，返回两侧段落数是否相同"""
+        self.segment_model.set_texts(source, target)
+        self.scrollToTop()
+        return self.segment_model.is_aligned()
@@ -10,11 +10,14 @@ import os
 import io
 import time
 import json
+import sqlite3
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QSystemTrayIcon, QMenu, 
                              QAction, QLabel, QVBoxLayout, QHBoxLayout, QWidget, 
-                             QPushButton, QTextEdit, QComboBox, QMessageBox,
-                             QDialog, QLineEdit, QFormLayout, QTabWidget, QCheckBox)
-from PyQt5.QtCore import Qt, QRect, QPoint, pyqtSignal, QThread, QSize
+                             QPushButton, QComboBox, QMessageBox,
+                             QDialog, QLineEdit, QFormLayout, QTabWidget, QCheckBox,
+                             QTableView, QHeaderView, QAbstractItemView)
+from PyQt5.QtCore import (Qt, QRect, QPoint, pyqtSignal, QThread, QSize, QTimer,
+                          QAbstractTableModel, QModelIndex)
 from PyQt5.QtGui import QPixmap, QIcon, QPainter, QPen, QColor, QCursor
 import pytesseract
 from PIL import Image, ImageGrab
@@ -24,7 +27,9 @@ import requests
 from dotenv import load_dotenv
 
 # 导入翻译服务模块
-from llm_service import translate_text
+from llm_service import TranslationService, available_backends
+from history import get_history
+from text_view import LargeTextEdit, AlignedSegmentView
 
 # 加载环境变量
 load_dotenv()
@@ -96,16 +101,53 @@ class SnippingWidget(QWidget):
 class TranslationThread(QThread):
     """翻译线程"""
     translation_done = pyqtSignal(str)
+    service_warning = pyqtSignal(str)
     
-    def __init__(self, text, target_lang):
+    def __init__(self, text, target_lang, reuse=None):
         super().__init__()
         self.text = text
         self.target_lang = target_lang
+        self.reuse = reuse
         
     def run(self):
         """运行翻译"""
-        translated_text = translate_text(self.text, self.target_lang)
+        service = TranslationService()
+        translated_text = service.translate(self.text, self.target_lang, reuse=self.reuse)
         self.translation_done.emit(translated_text)
+        for warning in service.warnings():
+            self.service_warning.emit(warning)
+
+
+class MultiTranslationThread(QThread):
+    """多语言并发翻译线程"""
+    target_done = pyqtSignal(int, str, str)
+    all_done = pyqtSignal(int)
+    service_warning = pyqtSignal(str)
+    
+    def __init__(self, text, target_langs, generation, reuse=None, parent=None):
+        super().__init__(parent)
+        self.text = text
+        self.target_langs = target_langs
+        self.reuse = reuse
+        # 发起本次翻译时的批次号，界面据此丢弃过期结果
+        self.generation = generation
+        
+    def run(self):
+        """运行翻译，每完成一种语言发出一次信号，无论成败最后都发出 all_done"""
+        service = None
+        try:
+            service = TranslationService()
+            service.translate_multi(self.text, self.target_langs,
+                                    on_result=lambda lang, text: self.target_done.emit(self.generation, lang, text),
+                                    reuse=self.reuse)
+        except Exception as e:
+            for lang in self.target_langs:
+                self.target_done.emit(self.generation, lang, f"翻译错误: {str(e)}\n原文: {self.text}")
+        finally:
+            if service is not None:
+                for warning in service.warnings():
+                    self.service_warning.emit(warning)
+            self.all_done.emit(self.generation)
 
 
 class SettingsDialog(QDialog):
@@ -132,6 +174,14 @@ class SettingsDialog(QDialog):
                         "model": "model_name",
                         "temperature": 0.3,
                         "api_endpoint": "http://localhost:8000/v1/chat/completions"
+                    },
+                    "llama_cpp": {
+                        "model_path": "",
+                        "temperature": 0.3,
+                        "n_threads": 0,
+                        "n_batch": 512,
+                        "n_ctx": 2048,
+                        "max_tokens": 0
                     }
                 },
                 "ocr": {
@@ -153,7 +203,7 @@ class SettingsDialog(QDialog):
         
         # 翻译服务选择
         self.service_combo = QComboBox()
-        self.service_combo.addItems(["openai", "local_llm"])
+        self.service_combo.addItems(available_backends())
         self.service_combo.setCurrentText(self.config["translation_service"])
         self.service_combo.currentTextChanged.connect(self.update_service_form)
         api_layout.addRow("翻译服务:", self.service_combo)
@@ -174,6 +224,23 @@ class SettingsDialog(QDialog):
         api_layout.addRow("Temperature:", self.local_temp)
         api_layout.addRow("API端点:", self.local_endpoint)
         
+        # llama.cpp进程内模型设置
+        llama_config = self.config["services"].setdefault("llama_cpp", {})
+        self.llama_model_path = QLineEdit(llama_config.get("model_path", ""))
+        self.llama_temp = QLineEdit(str(llama_config.get("temperature", 0.3)))
+        self.llama_threads = QLineEdit(str(llama_config.get("n_threads", 0)))
+        self.llama_batch = QLineEdit(str(llama_config.get("n_batch", 512)))
+        api_layout.addRow("llama.cpp模型路径:", self.llama_model_path)
+        api_layout.addRow("Temperature:", self.llama_temp)
+        api_layout.addRow("CPU线程数(0为自动):", self.llama_threads)
+        api_layout.addRow("批处理大小:", self.llama_batch)
+        
+        self.service_fields = {
+            "openai": [self.openai_model, self.openai_temp, self.openai_endpoint],
+            "local_llm": [self.local_model, self.local_temp, self.local_endpoint],
+            "llama_cpp": [self.llama_model_path, self.llama_temp, self.llama_threads, self.llama_batch],
+        }
+        
         api_tab.setLayout(api_layout)
         
         # OCR设置选项卡
@@ -234,20 +301,9 @@ class SettingsDialog(QDialog):
     def update_service_form(self):
         """根据选择的服务更新表单"""
         service = self.service_combo.currentText()
-        if service == "openai":
-            self.openai_model.setEnabled(True)
-            self.openai_temp.setEnabled(True)
-            self.openai_endpoint.setEnabled(True)
-            self.local_model.setEnabled(False)
-            self.local_temp.setEnabled(False)
-            self.local_endpoint.setEnabled(False)
-        else:
-            self.openai_model.setEnabled(False)
-            self.openai_temp.setEnabled(False)
-            self.openai_endpoint.setEnabled(False)
-            self.local_model.setEnabled(True)
-            self.local_temp.setEnabled(True)
-            self.local_endpoint.setEnabled(True)
+        for name, fields in self.service_fields.items():
+            for field in fields:
+                field.setEnabled(name == service)
     
     def save_settings(self):
         """保存设置"""
@@ -265,6 +321,12 @@ class SettingsDialog(QDialog):
             self.config["services"]["local_llm"]["temperature"] = float(self.local_temp.text())
             self.config["services"]["local_llm"]["api_endpoint"] = self.local_endpoint.text()
             
+            # llama.cpp设置
+            self.config["services"]["llama_cpp"]["model_path"] = self.llama_model_path.text()
+            self.config["services"]["llama_cpp"]["temperature"] = float(self.llama_temp.text())
+            self.config["services"]["llama_cpp"]["n_threads"] = int(self.llama_threads.text())
+            self.config["services"]["llama_cpp"]["n_batch"] = int(self.llama_batch.text())
+            
             # OCR设置
             self.config["ocr"]["tesseract_path"] = self.tesseract_path.text()
             
@@ -294,6 +356,199 @@ class SettingsDialog(QDialog):
             QMessageBox.warning(self, "错误", f"保存设置失败: {str(e)}")
 
 
+class HistorySearchThread(QThread):
+    """历史记录查询线程，避免查询大量记录时界面卡顿"""
+    page_loaded = pyqtSignal(int, list)
+    search_failed = pyqtSignal(int, str)
+    
+    def __init__(self, history, query, before_id, limit, generation):
+        super().__init__()
+        self.history = history
+        self.query = query
+        self.before_id = before_id
+        self.limit = limit
+        # 发起查询时的批次号，模型据此丢弃过期结果
+        self.generation = generation
+    
+    def run(self):
+        """查询一页记录"""
+        try:
+            page = self.history.search(self.query, before_id=self.before_id, limit=self.limit)
+        except sqlite3.Error as e:
+            self.search_failed.emit(self.generation, str(e))
+            return
+        self.page_loaded.emit(self.generation, page)
+
+
+class HistoryTableModel(QAbstractTableModel):
+    """历史记录表格模型，滚动到底部时在后台线程按页加载"""
+    COLUMNS = ["时间", "目标语言", "原文", "译文", "服务", "耗时"]
+    # 单元格只显示前若干字符，避免超长文本拖慢绘制
+    PREVIEW_LENGTH = 120
+    search_failed = pyqtSignal(str)
+    
+    def __init__(self, history, page_size=200, parent=None):
+        super().__init__(parent)
+        self.history = history
+        self.page_size = page_size
+        self.query = ""
+        self.rows = []
+        self.has_more = True
+        # 每次更换关键词加一，旧查询返回的结果直接丢弃
+        self.generation = 0
+        self.loading = False
+        self.search_threads = []
+    
+    def set_query(self, query):
+        """更换搜索关键词并从第一页重新加载"""
+        self.beginResetModel()
+        self.query = query
+        self.rows = []
+        self.has_more = True
+        self.generation += 1
+        self.loading = False
+        self.endResetModel()
+        if self.canFetchMore(QModelIndex()):
+            self.fetchMore(QModelIndex())
+    
+    def wait(self):
+        """等待仍在运行的查询线程结束"""
+        for thread in self.search_threads:
+            thread.wait()
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+    
+    def canFetchMore(self, parent):
+        return not parent.isValid() and self.has_more and not self.loading
+    
+    def fetchMore(self, parent):
+        """在后台线程查询下一页记录"""
+        self.loading = True
+        before_id = self.rows[-1]["id"] if self.rows else None
+        thread = HistorySearchThread(self.history, self.query, before_id, self.page_size, self.generation)
+        thread.page_loaded.connect(self.add_page)
+        thread.search_failed.connect(self.fail_page)
+        self.search_threads = [running for running in self.search_threads if running.isRunning()]
+        self.search_threads.append(thread)
+        thread.start()
+    
+    def fail_page(self, generation, message):
+        """查询出错时停止加载并通知界面"""
+        if generation != self.generation:
+            return
+        self.loading = False
+        self.has_more = False
+        self.search_failed.emit(message)
+    
+    def add_page(self, generation, page):
+        """追加查询到的一页记录"""
+        if generation != self.generation:
+            return
+        self.loading = False
+        self.has_more = len(page) == self.page_size
+        if not page:
+            return
+        self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(page) - 1)
+        self.rows.extend(page)
+        self.endInsertRows()
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.ToolTipRole):
+            return None
+        row = self.rows[index.row()]
+        column = index.column()
+        if column == 0:
+            return time.strftime("%Y-%m-%d %H:%M", time.localtime(row["created_at"]))
+        if column == 1:
+            return row["target_lang"]
+        if column in (2, 3):
+            text = row["source"] if column == 2 else row["target"]
+            text = text[:self.PREVIEW_LENGTH]
+            return text if role == Qt.ToolTipRole else " ".join(text.split())
+        if column == 4:
+            return row["backend"]
+        return f"{row['latency']:.2f}s"
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.COLUMNS[section]
+        return None
+
+
+class HistoryDialog(QDialog):
+    """翻译历史对话框"""
+    def __init__(self, history, page_size=200, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("历史记录")
+        self.resize(800, 500)
+        self.selected_entry = None
+        
+        # 搜索框，停止输入后再查询
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("搜索原文或译文...")
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(200)
+        self.search_timer.timeout.connect(self.run_search)
+        self.search_edit.textChanged.connect(self.search_timer.start)
+        
+        # 历史记录表格，固定行高以保证大量记录时滚动流畅
+        self.model = HistoryTableModel(history, page_size, self)
+        self.model.search_failed.connect(lambda message: QMessageBox.warning(self, "错误", f"查询历史记录失败: {message}"))
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setWordWrap(False)
+        self.table.verticalHeader().setVisible(False)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
+        self.table.horizontalHeader().setSectionResizeMode(3, QHeaderView.Stretch)
+        self.table.doubleClicked.connect(self.use_entry)
+        
+        # 按钮
+        button_layout = QHBoxLayout()
+        use_button = QPushButton("使用")
+        use_button.clicked.connect(lambda: self.use_entry(self.table.currentIndex()))
+        close_button = QPushButton("关闭")
+        close_button.clicked.connect(self.reject)
+        
+        button_layout.addStretch()
+        button_layout.addWidget(use_button)
+        button_layout.addWidget(close_button)
+        
+        # 主布局
+        main_layout = QVBoxLayout()
+        main_layout.addWidget(self.search_edit)
+        main_layout.addWidget(self.table)
+        main_layout.addLayout(button_layout)
+        
+        self.setLayout(main_layout)
+        self.run_search()
+    
+    def run_search(self):
+        """按搜索框内容重新查询"""
+        self.model.set_query(self.search_edit.text().strip())
+    
+    def done(self, result):
+        """关闭前等待后台查询结束"""
+        self.search_timer.stop()
+        self.model.wait()
+        super().done(result)
+    
+    def use_entry(self, index):
+        """选中一条历史记录并关闭对话框"""
+        if not index.isValid():
+            return
+        self.selected_entry = self.model.rows[index.row()]
+        self.accept()
+
+
 class TranslatorApp(QMainWindow):
     """翻译应用主窗口"""
     def __init__(self):
@@ -338,6 +593,9 @@ class TranslatorApp(QMainWindow):
         selection_action = QAction("选中翻译", self)
         selection_action.triggered.connect(self.translate_selection)
         
+        history_action = QAction("历史记录", self)
+        history_action.triggered.connect(self.show_history)
+        
         settings_action = QAction("设置", self)
         settings_action.triggered.connect(self.show_settings)
         
@@ -346,6 +604,7 @@ class TranslatorApp(QMainWindow):
         
         tray_menu.addAction(screenshot_action)
         tray_menu.addAction(selection_action)
+        tray_menu.addAction(history_action)
         tray_menu.addAction(settings_action)
         tray_menu.addSeparator()
         tray_menu.addAction(exit_action)
@@ -362,6 +621,10 @@ class TranslatorApp(QMainWindow):
         # 注册全局热键
         self.register_hotkeys()
         
+        # 检查翻译服务（术语表等）是否正常，同一问题只弹窗提示一次
+        self.shown_warnings = set()
+        self.check_service()
+        
     def init_ui(self):
         """初始化UI界面"""
         central_widget = QWidget()
@@ -370,48 +633,102 @@ class TranslatorApp(QMainWindow):
         layout = QVBoxLayout()
         
         # 源文本和翻译结果
-        self.source_text = QTextEdit()
+        self.source_text = LargeTextEdit()
         self.source_text.setPlaceholderText("输入要翻译的文本...")
         
-        self.target_text = QTextEdit()
+        self.target_text = LargeTextEdit()
         self.target_text.setPlaceholderText("翻译结果将显示在这里...")
         self.target_text.setReadOnly(True)
+        self.target_text.setUndoRedoEnabled(False)
+        
+        # 原文译文逐段对照视图
+        self.segment_view = AlignedSegmentView()
+        
+        # 翻译结果选项卡，多语言模式下每种语言一个选项卡
+        self.result_tabs = QTabWidget()
+        self.result_tabs.addTab(self.target_text, "翻译")
+        self.result_tabs.addTab(self.segment_view, "对照")
+        self.result_tabs.currentChanged.connect(self.refresh_segment_view)
+        self.multi_target_texts = {}
+        self.multi_generation = 0
         
         # 语言选择
+        all_target_langs = ["中文", "英文", "日文", "韩文", "法文", "德文", "西班牙文"]
         lang_layout = QHBoxLayout()
         target_lang_label = QLabel("目标语言:")
         self.target_lang_combo = QComboBox()
-        self.target_lang_combo.addItems(["中文", "英文", "日文", "韩文", "法文", "德文", "西班牙文"])
+        self.target_lang_combo.addItems(all_target_langs)
+        
+        self.multi_lang_check = QCheckBox("多语言")
+        self.multi_lang_check.toggled.connect(self.toggle_multi_lang)
         
         lang_layout.addWidget(target_lang_label)
         lang_layout.addWidget(self.target_lang_combo)
+        lang_layout.addWidget(self.multi_lang_check)
         lang_layout.addStretch(1)
         
+        # 多语言模式下的目标语言复选框
+        self.multi_lang_widget = QWidget()
+        multi_lang_layout = QHBoxLayout()
+        multi_lang_layout.setContentsMargins(0, 0, 0, 0)
+        self.multi_lang_checkboxes = {}
+        for lang in all_target_langs:
+            cb = QCheckBox(lang)
+            self.multi_lang_checkboxes[lang] = cb
+            multi_lang_layout.addWidget(cb)
+        multi_lang_layout.addStretch(1)
+        self.multi_lang_widget.setLayout(multi_lang_layout)
+        self.multi_lang_widget.setVisible(False)
+        
         # 按钮布局
         button_layout = QHBoxLayout()
         
         # 翻译按钮
         translate_btn = QPushButton("翻译")
-        translate_btn.clicked.connect(self.translate_input)
+        translate_btn.clicked.connect(lambda: self.translate_input())
+        
+        # 重新翻译按钮，不复用历史译文
+        retranslate_btn = QPushButton("重新翻译")
+        retranslate_btn.setToolTip("忽略历史记录，重新请求翻译")
+        retranslate_btn.clicked.connect(lambda: self.translate_input(retranslate=True))
         
         # 截图翻译按钮
         screenshot_btn = QPushButton("截图翻译")
         screenshot_btn.clicked.connect(self.start_screenshot)
         
+        # 历史记录按钮
+        history_btn = QPushButton("历史记录")
+        history_btn.clicked.connect(self.show_history)
+        
         button_layout.addWidget(translate_btn)
+        button_layout.addWidget(retranslate_btn)
         button_layout.addWidget(screenshot_btn)
+        button_layout.addWidget(history_btn)
         button_layout.addStretch(1)
         
         # 布局
         layout.addWidget(QLabel("原文:"))
         layout.addWidget(self.source_text)
         layout.addLayout(lang_layout)
+        layout.addWidget(self.multi_lang_widget)
         layout.addLayout(button_layout)
         layout.addWidget(QLabel("翻译:"))
-        layout.addWidget(self.target_text)
+        layout.addWidget(self.result_tabs)
         
         central_widget.setLayout(layout)
     
+    def check_service(self):
+        """检查翻译服务配置，有功能未生效时提示用户，避免其被悄悄关闭"""
+        for warning in TranslationService().warnings():
+            self.show_service_warning(warning)
+    
+    def show_service_warning(self, message):
+        """在状态栏显示服务问题，同一问题只弹窗一次"""
+        self.statusBar().showMessage(message)
+        if message not in self.shown_warnings:
+            self.shown_warnings.add(message)
+            QMessageBox.warning(self, "警告", message)
+    
     def register_hotkeys(self):
         """注册全局热键"""
         # 先解绑所有热键
@@ -486,19 +803,28 @@ class TranslatorApp(QMainWindow):
         # 翻译文本
         self.translate_input()
     
-    def translate_input(self):
-        """翻译输入框中的文本"""
+    def translate_input(self, retranslate=False):
+        """翻译输入框中的文本
+        
+        参数:
+            retranslate (bool): 为 True 时不复用历史译文，强制重新翻译
+        """
         text = self.source_text.toPlainText()
         
         if not text:
             QMessageBox.information(self, "提示", "请输入需要翻译的文本")
             return
         
+        if self.multi_lang_check.isChecked():
+            self.translate_input_multi(text, retranslate)
+            return
+        
         target_lang = self.target_lang_combo.currentText()
         
         # 创建并启动翻译线程
-        self.translation_thread = TranslationThread(text, target_lang)
+        self.translation_thread = TranslationThread(text, target_lang, False if retranslate else None)
         self.translation_thread.translation_done.connect(self.update_translation)
+        self.translation_thread.service_warning.connect(self.show_service_warning)
         self.translation_thread.start()
         
         # 禁用翻译按钮，显示翻译中
@@ -507,6 +833,107 @@ class TranslatorApp(QMainWindow):
     def update_translation(self, translated_text):
         """更新翻译结果"""
         self.target_text.setText(translated_text)
+        self.refresh_segment_view()
+    
+    def refresh_segment_view(self):
+        """对照视图可见时按当前原文和译文重建"""
+        if self.result_tabs.currentWidget() is self.segment_view:
+            if not self.segment_view.set_texts(self.source_text.toPlainText(), self.target_text.toPlainText()):
+                model = self.segment_view.segment_model
+                self.statusBar().showMessage(
+                    f"原文 {model.source_count} 段，译文 {model.target_count} 段，对照按顺序逐段排列，部分段落可能错位")
+    
+    def toggle_multi_lang(self, checked):
+        """切换单语言/多语言模式"""
+        self.multi_lang_widget.setVisible(checked)
+        self.target_lang_combo.setEnabled(not checked)
+        if not checked:
+            self.reset_result_tabs()
+    
+    def reset_result_tabs(self, target_langs=None):
+        """重建结果选项卡
+        
+        参数:
+            target_langs (list): 多语言模式下的目标语言，为空时恢复单一结果框
+        """
+        # 选项卡重建后，之前尚未完成的多语言翻译结果一律作废
+        self.multi_generation += 1
+        self.multi_lang_widget.setEnabled(True)
+        
+        self.result_tabs.clear()
+        for text_edit in self.multi_target_texts.values():
+            text_edit.deleteLater()
+        self.multi_target_texts = {}
+        
+        if not target_langs:
+            self.result_tabs.addTab(self.target_text, "翻译")
+            self.result_tabs.addTab(self.segment_view, "对照")
+            return
+        
+        for lang in target_langs:
+            text_edit = LargeTextEdit()
+            text_edit.setReadOnly(True)
+            text_edit.setUndoRedoEnabled(False)
+            text_edit.setText("翻译中...")
+            self.multi_target_texts[lang] = text_edit
+            self.result_tabs.addTab(text_edit, lang)
+    
+    def translate_input_multi(self, text, retranslate=False):
+        """将输入文本同时翻译成所有勾选的语言"""
+        target_langs = [lang for lang, cb in self.multi_lang_checkboxes.items() if cb.isChecked()]
+        if not target_langs:
+            QMessageBox.information(self, "提示", "请至少选择一种目标语言")
+            return
+        
+        # 为每种语言创建一个结果选项卡
+        self.reset_result_tabs(target_langs)
+        
+        # 创建并启动多语言翻译线程，线程以主窗口为父对象，结束前不会被回收
+        thread = MultiTranslationThread(text, target_langs, self.multi_generation,
+                                        False if retranslate else None, self)
+        thread.target_done.connect(self.update_multi_translation)
+        thread.all_done.connect(self.finish_multi_translation)
+        thread.service_warning.connect(self.show_service_warning)
+        thread.finished.connect(thread.deleteLater)
+        self.multi_translation_thread = thread
+        thread.start()
+        
+        # 翻译完成前锁定语言选择
+        self.multi_lang_widget.setEnabled(False)
+        self.statusBar().showMessage(f"正在翻译成 {len(target_langs)} 种语言...")
+    
+    def update_multi_translation(self, generation, target_lang, translated_text):
+        """更新某一目标语言的翻译结果"""
+        if generation != self.multi_generation:
+            return
+        text_edit = self.multi_target_texts.get(target_lang)
+        if text_edit is not None:
+            text_edit.setText(translated_text)
+    
+    def finish_multi_translation(self, generation):
+        """多语言翻译全部完成"""
+        if generation != self.multi_generation:
+            return
+        self.multi_lang_widget.setEnabled(True)
+        self.statusBar().showMessage("多语言翻译完成", 3000)
+    
+    def show_history(self):
+        """显示历史记录界面"""
+        history_config = self.config.get("history", {})
+        try:
+            history = get_history(history_config.get("path", "history.db"))
+        except Exception as e:
+            QMessageBox.warning(self, "错误", f"打开历史记录失败: {str(e)}")
+            return
+        
+        history_dialog = HistoryDialog(history, history_config.get("page_size", 200), self)
+        if history_dialog.exec_() == QDialog.Accepted and history_dialog.selected_entry:
+            entry = history_dialog.selected_entry
+            self.show()
+            self.multi_lang_check.setChecked(False)
+            self.target_lang_combo.setCurrentText(entry["target_lang"])
+            self.source_text.setText(entry["source"])
+            self.target_text.setText(entry["target"])
     
     def show_settings(self):
         """显示设置界面"""
@@ -520,6 +947,9 @@ class TranslatorApp(QMainWindow):
                 # 重新注册热键
                 self.register_hotkeys()
                 
+                # 重新检查翻译服务
+                self.check_service()
+                
                 # 设置Tesseract路径
                 if self.config["ocr"].get("tesseract_path"):
                     pytesseract.pytesseract.tesseract_cmd = self.config["ocr"]["tesseract_path"]